@@ -0,0 +1,136 @@
+"""
+Numeric kernels for HealthAgent.
+
+`score_week` takes the (days, meals, 4) float64 macro array built by
+HealthAgent, the 4 daily targets (calories, protein, carbs, fat) and their
+reciprocals (0 where a target is 0, so that macro adds no penalty) and
+returns (totals, deltas, scores, flag_bits) at full precision. flag_bits is a
+uint8 per day with bit k set when macro k is more than 20% off target.
+
+`score_weeks` does the same for a (weeks, days, meals, 4) batch of candidate
+weeks and returns arrays with a leading weeks axis. Whenever numba is
+installed the weeks are scored in parallel; cap the thread count with
+NUMBA_NUM_THREADS when running inside a web server.
+
+Backends for `score_week`, in order of preference: the Cython extension
+agents._macros if it has been built (see agents/_macros.pyx), a Numba
+kernel if numba is installed, otherwise a NumPy implementation with the same
+contract. `score_weeks` prefers the parallel Numba kernel, then a loop over
+the Cython `score_week`, then NumPy.
+"""
+
+import numpy as np
+
+_FLAG_WEIGHTS = np.array([1, 2, 4, 8], dtype=np.uint8)
+
+try:
+    from agents._macros import score_week as _score_week_cython
+    CYTHON_AVAILABLE = True
+except ImportError:
+    CYTHON_AVAILABLE = False
+    _score_week_cython = None
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except Exception:
+    NUMBA_AVAILABLE = False
+    njit = prange = None
+
+
+def _score_week_numpy(arr: np.ndarray, targets: np.ndarray, inv_targets: np.ndarray):
+    # axes counted from the end so a leading weeks axis broadcasts through
+    with np.errstate(over="ignore"):  # an overflowing total is inf, as in Python
+        totals = arr.sum(axis=-2)
+    deltas = totals - targets
+    # a zero target adds no penalty, even for a NaN or inf total (nan * 0 is
+    # nan), and is skipped rather than masked afterwards so nothing warns
+    pcts = np.multiply(np.abs(deltas), inv_targets, where=inv_targets != 0.0, out=np.zeros_like(deltas))
+    # fmax, like max(0.0, x) in the other backends, turns a NaN score into 0.0
+    scores = np.fmax(0.0, 100.0 - pcts.sum(axis=-1) * 25.0)
+    flag_bits = (pcts > 0.2).astype(np.uint8) @ _FLAG_WEIGHTS
+    return totals, deltas, scores, flag_bits
+
+
+def _score_weeks_loop(batch: np.ndarray, targets: np.ndarray, inv_targets: np.ndarray):
+    results = [score_week(week, targets, inv_targets) for week in batch]
+    return tuple(np.stack(parts) for parts in zip(*results))
+
+
+if NUMBA_AVAILABLE:
+    # When this is the serving backend, the eager signature compiles (or
+    # loads from cache) at import time rather than on the first request.
+    # With the Cython build in use it stays lazy and only compiles if called,
+    # e.g. from _score_weeks_kernel or by test_health_agent.py.
+    _SCORE_WEEK_SIG = "Tuple((f8[:, ::1], f8[:, ::1], f8[::1], u1[::1]))(f8[:, :, ::1], f8[::1], f8[::1])"
+
+    @njit(*([] if CYTHON_AVAILABLE else [_SCORE_WEEK_SIG]), cache=True)
+    def _score_week_kernel(arr, targets, inv_targets):
+        n_days, n_meals = arr.shape[0], arr.shape[1]
+        totals = np.empty((n_days, 4), dtype=np.float64)
+        deltas = np.empty((n_days, 4), dtype=np.float64)
+        scores = np.empty(n_days, dtype=np.float64)
+        flag_bits = np.zeros(n_days, dtype=np.uint8)
+
+        for d in range(n_days):
+            cal = 0.0
+            prot = 0.0
+            carb = 0.0
+            fat = 0.0
+            for m in range(n_meals):
+                cal += arr[d, m, 0]
+                prot += arr[d, m, 1]
+                carb += arr[d, m, 2]
+                fat += arr[d, m, 3]
+            totals[d, 0] = cal
+            totals[d, 1] = prot
+            totals[d, 2] = carb
+            totals[d, 3] = fat
+
+            penalty = 0.0
+            for k in range(4):
+                deltas[d, k] = totals[d, k] - targets[k]
+                pct = abs(deltas[d, k]) * inv_targets[k] if inv_targets[k] != 0.0 else 0.0
+                penalty += pct
+                flag_bits[d] |= (pct > 0.2) << k
+            scores[d] = max(0.0, 100.0 - penalty * 25.0)
+
+        return totals, deltas, scores, flag_bits
+
+    # A single week is too small to be worth threading; parallelize over the
+    # batch of candidate weeks instead. No eager signature: the parallel
+    # build is the slow one, so it is compiled on the first evaluate_weeks
+    # call rather than at import.
+    @njit(cache=True, parallel=True)
+    def _score_weeks_kernel(batch, targets, inv_targets):
+        n_weeks, n_days = batch.shape[0], batch.shape[1]
+        totals = np.empty((n_weeks, n_days, 4), dtype=np.float64)
+        deltas = np.empty((n_weeks, n_days, 4), dtype=np.float64)
+        scores = np.empty((n_weeks, n_days), dtype=np.float64)
+        flag_bits = np.empty((n_weeks, n_days), dtype=np.uint8)
+
+        for w in prange(n_weeks):
+            week_totals, week_deltas, week_scores, week_bits = _score_week_kernel(
+                batch[w], targets, inv_targets
+            )
+            totals[w] = week_totals
+            deltas[w] = week_deltas
+            scores[w] = week_scores
+            flag_bits[w] = week_bits
+
+        return totals, deltas, scores, flag_bits
+
+
+if CYTHON_AVAILABLE:
+    score_week = _score_week_cython
+elif NUMBA_AVAILABLE:
+    score_week = _score_week_kernel
+else:
+    score_week = _score_week_numpy
+
+if NUMBA_AVAILABLE:
+    score_weeks = _score_weeks_kernel
+elif CYTHON_AVAILABLE:
+    score_weeks = _score_weeks_loop
+else:
+    score_weeks = _score_week_numpy
@@ -0,0 +1,49 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Cython build of the HealthAgent week scoring kernel.
+
+Same contract as agents._health_kernels.score_week, without NumPy per-call
+dispatch or a JIT. Optional: build in place with
+
+    cythonize -i agents/_macros.pyx
+
+and agents._health_kernels picks it up automatically.
+"""
+
+import numpy as np
+
+
+def score_week(const double[:, :, ::1] arr, const double[::1] targets, const double[::1] inv_targets):
+    cdef Py_ssize_t n_days = arr.shape[0]
+    cdef Py_ssize_t n_meals = arr.shape[1]
+    cdef Py_ssize_t d, m, k
+    cdef double acc, pct, penalty
+    cdef unsigned char bits
+
+    totals_arr = np.empty((n_days, 4), dtype=np.float64)
+    deltas_arr = np.empty((n_days, 4), dtype=np.float64)
+    scores_arr = np.empty(n_days, dtype=np.float64)
+    flag_bits_arr = np.empty(n_days, dtype=np.uint8)
+    cdef double[:, ::1] totals = totals_arr
+    cdef double[:, ::1] deltas = deltas_arr
+    cdef double[::1] scores = scores_arr
+    cdef unsigned char[::1] flag_bits = flag_bits_arr
+
+    for d in range(n_days):
+        penalty = 0.0
+        bits = 0
+        for k in range(4):
+            acc = 0.0
+            for m in range(n_meals):
+                acc += arr[d, m, k]
+            totals[d, k] = acc
+            deltas[d, k] = acc - targets[k]
+            # a zero target adds no penalty, even for a NaN or inf total
+            pct = abs(deltas[d, k]) * inv_targets[k] if inv_targets[k] != 0.0 else 0.0
+            penalty += pct
+            if pct > 0.2:
+                bits |= 1 << k
+        scores[d] = max(0.0, 100.0 - penalty * 25.0)
+        flag_bits[d] = bits
+
+    return totals_arr, deltas_arr, scores_arr, flag_bits_arr
@@ -1,10 +1,40 @@
+from functools import lru_cache
 from typing import List
+import numpy as np
 from models.schema import (
     UserHealthProfile,
     WeekPlan,
     DayHealthReport,
     WeekHealthReport,
 )
+from agents._health_kernels import score_week, score_weeks
+
+# Flag raised for each macro column (calories, protein, carbs, fat) when the
+# day deviates from its target by more than 20%.
+_FLAG_NAMES = (
+    "calories_far_from_target",
+    "protein_far_from_target",
+    "carbs_far_from_target",
+    "fat_far_from_target",
+)
+
+_NO_MACROS = (0.0, 0.0, 0.0, 0.0)
+
+# Flag lists for every 4-bit mask returned by the scoring kernel, bit k
+# standing for _FLAG_NAMES[k].
+_FLAG_TABLE = tuple(
+    tuple(name for bit, name in enumerate(_FLAG_NAMES) if mask >> bit & 1)
+    for mask in range(16)
+)
+
+
+@lru_cache(maxsize=64)
+def _target_arrays(calories: float, protein_g: float, carbs_g: float, fat_g: float):
+    # Cached per distinct target set, so planner loops scoring many weeks for
+    # one profile reuse the same arrays. The kernels only read them.
+    targets = np.array([calories, protein_g, carbs_g, fat_g], dtype=np.float64)
+    inv_targets = np.reciprocal(targets, where=targets != 0, out=np.zeros_like(targets))
+    return targets, inv_targets
 
 
 class HealthAgent:
@@ -12,62 +42,62 @@ class HealthAgent:
     Evaluates nutrition of a WeekPlan against user calorie/macro goals.
     """
 
-    def _score_day(self, report: DayHealthReport, profile: UserHealthProfile) -> DayHealthReport:
-        # simple scoring: penalty proportional to absolute percentage deviation
-        flags: List[str] = []
-
-        def pct_delta(actual: float, target: float) -> float:
-            if target == 0:
-                return 0.0
-            return abs(actual - target) / target
+    def _week_to_ndarray(self, week_plan: WeekPlan) -> np.ndarray:
+        """
+        Pack per-meal macros into a (days, meals, 4) float64 array.
 
-        cal_pen = pct_delta(report.total_calories, profile.daily_calorie_target)
-        prot_pen = pct_delta(report.total_protein_g, profile.protein_target_g)
-        carb_pen = pct_delta(report.total_carbs_g, profile.carb_target_g)
-        fat_pen = pct_delta(report.total_fat_g, profile.fat_target_g)
+        Columns are calories, protein, carbs, fat. Days with fewer meals and
+        meals without macros are padded with zeros so they add nothing to
+        totals. Each meal is visited once and its macros read in a single
+        attribute fetch.
+        """
+        n_days = len(week_plan.days)
+        n_meals = max((len(day.meals) for day in week_plan.days), default=0)
+        rows = []
 
-        raw_penalty = cal_pen + prot_pen + carb_pen + fat_pen
-        score = max(0.0, 100.0 - raw_penalty * 25.0)  # tune factor
+        for day in week_plan.days:
+            row = []
+            for meal in day.meals:
+                mac = meal.macros_per_serving
+                if mac is None:
+                    row.append(_NO_MACROS)
+                else:
+                    row.append((mac.calories, mac.protein_g, mac.carbs_g, mac.fat_g))
+            row.extend([_NO_MACROS] * (n_meals - len(row)))
+            rows.append(row)
 
-        if cal_pen > 0.2:
-            flags.append("calories_far_from_target")
-        if prot_pen > 0.2:
-            flags.append("protein_far_from_target")
-        if carb_pen > 0.2:
-            flags.append("carbs_far_from_target")
-        if fat_pen > 0.2:
-            flags.append("fat_far_from_target")
+        return np.array(rows, dtype=np.float64).reshape(n_days, n_meals, 4)
 
-        report.score = round(score, 1)
-        report.flags = flags
-        return report
+    def _targets(self, profile: UserHealthProfile):
+        """Daily targets and their reciprocals (0 for a zero target)."""
+        return _target_arrays(
+            profile.daily_calorie_target,
+            profile.protein_target_g,
+            profile.carb_target_g,
+            profile.fat_target_g,
+        )
 
-    def evaluate_week(self, week_plan: WeekPlan, profile: UserHealthProfile) -> WeekHealthReport:
+    def _build_report(self, week_plan: WeekPlan, totals, deltas, scores, flag_bits) -> WeekHealthReport:
         daily_reports: List[DayHealthReport] = []
-
-        for day in week_plan.days:
-            total_cal = sum(m.macros_per_serving.calories for m in day.meals if m.macros_per_serving)
-            total_prot = sum(m.macros_per_serving.protein_g for m in day.meals if m.macros_per_serving)
-            total_carb = sum(m.macros_per_serving.carbs_g for m in day.meals if m.macros_per_serving)
-            total_fat = sum(m.macros_per_serving.fat_g for m in day.meals if m.macros_per_serving)
-
-            report = DayHealthReport(
-                day_name=day.day_name,
-                total_calories=round(total_cal, 1),
-                total_protein_g=round(total_prot, 1),
-                total_carbs_g=round(total_carb, 1),
-                total_fat_g=round(total_fat, 1),
-                calorie_delta=round(total_cal - profile.daily_calorie_target, 1),
-                protein_delta=round(total_prot - profile.protein_target_g, 1),
-                carb_delta=round(total_carb - profile.carb_target_g, 1),
-                fat_delta=round(total_fat - profile.fat_target_g, 1),
-                score=0.0,
-                flags=[],
+        for day, total, delta, score, bits in zip(
+            week_plan.days, totals.tolist(), deltas.tolist(), scores.tolist(), flag_bits.tolist()
+        ):
+            daily_reports.append(
+                DayHealthReport(
+                    day_name=day.day_name,
+                    total_calories=total[0],
+                    total_protein_g=total[1],
+                    total_carbs_g=total[2],
+                    total_fat_g=total[3],
+                    calorie_delta=delta[0],
+                    protein_delta=delta[1],
+                    carb_delta=delta[2],
+                    fat_delta=delta[3],
+                    score=score,
+                    flags=list(_FLAG_TABLE[bits]),
+                )
             )
 
-            report = self._score_day(report, profile)
-            daily_reports.append(report)
-
         avg_score = sum(r.score for r in daily_reports) / len(daily_reports)
         global_flags = []
         if avg_score < 70:
@@ -75,6 +105,40 @@ class HealthAgent:
 
         return WeekHealthReport(
             daily_reports=daily_reports,
-            average_score=round(avg_score, 1),
+            average_score=avg_score,
             global_flags=global_flags,
         )
+
+    def evaluate_week(self, week_plan: WeekPlan, profile: UserHealthProfile) -> WeekHealthReport:
+        arr = self._week_to_ndarray(week_plan)
+        targets, inv_targets = self._targets(profile)
+
+        # simple scoring: penalty proportional to absolute percentage deviation,
+        # a zero target adds no penalty
+        totals, deltas, scores, flag_bits = score_week(arr, targets, inv_targets)
+        return self._build_report(week_plan, totals, deltas, scores, flag_bits)
+
+    def evaluate_weeks(self, week_plans: List[WeekPlan], profile: UserHealthProfile) -> List[WeekHealthReport]:
+        """
+        Score a batch of candidate weeks against one profile in a single
+        kernel call (parallel across weeks when Numba is installed).
+        Reports are the same as calling evaluate_week on each plan.
+        """
+        if not week_plans:
+            return []
+
+        arrs = [self._week_to_ndarray(week_plan) for week_plan in week_plans]
+        n_days = max(arr.shape[0] for arr in arrs)
+        n_meals = max(arr.shape[1] for arr in arrs)
+        batch = np.zeros((len(arrs), n_days, n_meals, 4), dtype=np.float64)
+        for i, arr in enumerate(arrs):
+            batch[i, : arr.shape[0], : arr.shape[1]] = arr
+
+        targets, inv_targets = self._targets(profile)
+        totals, deltas, scores, flag_bits = score_weeks(batch, targets, inv_targets)
+
+        # padding days beyond a plan's length are dropped by zip in _build_report
+        return [
+            self._build_report(week_plan, totals[i], deltas[i], scores[i], flag_bits[i])
+            for i, week_plan in enumerate(week_plans)
+        ]
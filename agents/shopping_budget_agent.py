@@ -1,9 +1,7 @@
-import re
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
 import os, json, asyncio, re
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 from google.adk.agents import Agent
 from google.adk.models.google_llm import Gemini
@@ -94,12 +92,27 @@ Rules:
 UNITS = {"cup","cups","tablespoon","tbsp","teaspoon","tsp","clove","cloves",
          "pound","lb","gram","g","kg","ml","l"}
 
+# built once at import rather than on every normalize() call
+SYNONYMS = {"broccoli florets":"broccoli","button mushrooms":"mushrooms",
+            "red onion":"onion","extra virgin olive oil":"olive oil",
+            "parmesan":"parmesan cheese","fresh basil":"basil"}
+
+@lru_cache(maxsize=4096)
 def normalize(name: str) -> str:
     name = name.lower().split(",")[0].strip()
-    synonyms = {"broccoli florets":"broccoli","button mushrooms":"mushrooms",
-                "red onion":"onion","extra virgin olive oil":"olive oil",
-                "parmesan":"parmesan cheese","fresh basil":"basil"}
-    return synonyms.get(name,name)
+    return SYNONYMS.get(name,name)
+
+def _parse_ingredient_string(line:str)->Optional[Tuple[float,str,str]]:
+    """Split "<qty> [unit] <name>" into (qty, unit, name); None without a leading qty."""
+    # str.split + float() measured faster than a compiled regex for this format
+    tokens=line.split()
+    if not tokens: return None
+    try: qty=float(tokens[0])
+    except ValueError: return None
+    unit=tokens[1].lower() if len(tokens)>1 else ""
+    if unit not in UNITS: unit="piece"
+    name=" ".join(tokens[2:]) if unit!="piece" else " ".join(tokens[1:])
+    return qty,unit,name
 
 @dataclass
 class ShoppingItem:
@@ -127,16 +140,33 @@ class ShoppingBudgetAgent:
     def __init__(self,currency="INR"):
         self.currency,self.fetcher=currency,GooglePriceFetcher()
 
-    def process(self,recipe:Dict[str,Any],budget:Optional[float]=None)->Dict[str,Any]:
-        lines=[l for sec in recipe.get("ingredients",{}).values() if isinstance(sec,list) for l in sec]
+    def process(self,recipe:Dict[str,Any],budget:Optional[float]=None,
+                early_exit_ratio:Optional[float]=None)->Dict[str,Any]:
+        """
+        Price every ingredient line of `recipe` and compare the total to `budget`.
+
+        With early_exit_ratio set, pricing stops as soon as the running total
+        exceeds budget * early_exit_ratio and the result carries
+        "partial": True, which saves price lookups when a caller only needs to
+        know the recipe is far over budget. The ratio needs a budget and must
+        be >= 1 (NaN is rejected) so a partial result is always over budget;
+        when "partial" is True the reported estimated_total_cost and
+        amount_over_budget are lower bounds.
+        """
+        if early_exit_ratio is not None:
+            if budget is None:
+                raise ValueError("early_exit_ratio needs a budget")
+            if not early_exit_ratio>=1:
+                raise ValueError(f"early_exit_ratio must be >= 1, got {early_exit_ratio}")
+        stop_at=None if early_exit_ratio is None else budget*early_exit_ratio
+        partial=False
+        # stream lines straight from the recipe sections instead of copying them into a list first
+        lines=(l for sec in recipe.get("ingredients",{}).values() if isinstance(sec,list) for l in sec)
         items=[]; total=0
         for line in lines:
-            tokens=line.split()
-            if not tokens: continue
-            try: qty=float(tokens[0])
-            except: continue
-            unit=tokens[1].lower() if len(tokens)>1 and tokens[1].lower() in UNITS else "piece"
-            name=" ".join(tokens[2:]) if unit!="piece" else " ".join(tokens[1:])
+            parsed=_parse_ingredient_string(line)
+            if parsed is None: continue
+            qty,unit,name=parsed
             norm=normalize(name)
             info=self.fetcher.fetch_price(norm)
             if info:
@@ -144,8 +174,12 @@ class ShoppingBudgetAgent:
                 items.append({"ingredient":name,"normalized":norm,"qty":qty,"unit":unit,
                               "title":info["title"],"url":info["url"],
                               "price":info["price"],"currency":self.currency})
-        return {"recipe":recipe.get("recipe_name","Unknown"),"currency":self.currency,
+                if stop_at is not None and total>stop_at:
+                    partial=True; break
+        result={"recipe":recipe.get("recipe_name","Unknown"),"currency":self.currency,
                 "items":items,"estimated_total_cost":round(total,2),"budget":budget,
                 "within_budget":None if budget is None else total<=budget,
                 "amount_over_budget":None if budget is None else max(0,total-budget),
                 "amount_under_budget":None if budget is None else max(0,budget-total)}
+        if stop_at is not None: result["partial"]=partial
+        return result
@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
 
 
 class UserHealthProfile(BaseModel):
@@ -57,8 +57,27 @@ class DayHealthReport(BaseModel):
     score: float
     flags: List[str]
 
+    # values are kept at full precision and only rounded when serialized
+    @field_serializer(
+        "total_calories",
+        "total_protein_g",
+        "total_carbs_g",
+        "total_fat_g",
+        "calorie_delta",
+        "protein_delta",
+        "carb_delta",
+        "fat_delta",
+        "score",
+    )
+    def _round_1dp(self, value: float) -> float:
+        return round(value, 1)
+
 
 class WeekHealthReport(BaseModel):
     daily_reports: List[DayHealthReport]
     average_score: float
     global_flags: List[str]
+
+    @field_serializer("average_score")
+    def _round_1dp(self, value: float) -> float:
+        return round(value, 1)
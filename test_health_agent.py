@@ -0,0 +1,260 @@
+"""
+Check HealthAgent scoring against the original pure-Python implementation
+
+Scores random weeks (ragged days, meals without macros, zero targets) with
+HealthAgent.evaluate_week and with every score_week backend available here
+(NumPy always, Numba if installed, the Cython build of agents/_macros.pyx
+if built) and compares the results with a plain Python version of the
+original per-day scoring. The batch path behind
+HealthAgent.evaluate_weeks is checked against score_week and
+evaluate_week.
+
+Run directly (python test_health_agent.py) or with pytest.
+"""
+
+import math
+import random
+import warnings
+from typing import List
+
+import numpy as np
+
+from models.schema import Meal, MealNutrition, DayPlan, WeekPlan, UserHealthProfile
+from agents.health_agent import HealthAgent, _FLAG_NAMES, _FLAG_TABLE
+import agents._health_kernels as kernels
+
+N_WEEKS = 300
+# Scoring runs at full precision; only the reciprocal targets can move the
+# last bits of a value.
+TOL = 1e-6
+# Multiplying by the reciprocal target can put a macro exactly 20% off target
+# on either side of the flag threshold; flags are only compared away from it.
+FLAG_TIE = 1e-9
+
+
+def _backends():
+    backends = {"numpy": kernels._score_week_numpy}
+    if kernels.NUMBA_AVAILABLE:
+        backends["numba"] = kernels._score_week_kernel
+    if kernels.CYTHON_AVAILABLE:
+        backends["cython"] = kernels._score_week_cython
+    return backends
+
+
+def _batch_backends():
+    backends = {"numpy": kernels._score_week_numpy, "loop": kernels._score_weeks_loop}
+    if kernels.NUMBA_AVAILABLE:
+        backends["numba"] = kernels._score_weeks_kernel
+    return backends
+
+
+def _kernel_args(agent: HealthAgent, week: WeekPlan, profile: UserHealthProfile):
+    return (agent._week_to_ndarray(week), *agent._targets(profile))
+
+
+def _random_weeks(seed: int = 42) -> List[WeekPlan]:
+    rng = random.Random(seed)
+    weeks = []
+    for _ in range(N_WEEKS):
+        days = []
+        for d in range(rng.randint(1, 9)):
+            meals = []
+            for m in range(rng.randint(0, 5)):
+                if rng.random() < 0.1:
+                    macros = None
+                else:
+                    macros = MealNutrition(
+                        calories=round(rng.uniform(0, 1200), rng.choice([0, 1, 3])),
+                        protein_g=rng.uniform(0, 80),
+                        carbs_g=rng.uniform(0, 150),
+                        fat_g=rng.uniform(0, 60),
+                    )
+                meals.append(Meal(id=f"{d}-{m}", name="meal", ingredients=[], macros_per_serving=macros))
+            days.append(DayPlan(day_name=f"Day {d + 1}", meals=meals))
+        weeks.append(WeekPlan(days=days))
+    return weeks
+
+
+def _profiles() -> List[UserHealthProfile]:
+    return [
+        UserHealthProfile(),
+        UserHealthProfile(daily_calorie_target=1800, protein_target_g=120, carb_target_g=0, fat_target_g=60),
+        UserHealthProfile(daily_calorie_target=0, protein_target_g=0, carb_target_g=0, fat_target_g=0),
+    ]
+
+
+def _reference_day(day: DayPlan, profile: UserHealthProfile):
+    """
+    Original scoring of one day at full precision (reports round to 1
+    decimal only when serialized): (totals, deltas, score, flags, pcts).
+    """
+    sums = [0.0, 0.0, 0.0, 0.0]
+    for meal in day.meals:
+        mac = meal.macros_per_serving
+        if mac is not None:
+            sums[0] += mac.calories
+            sums[1] += mac.protein_g
+            sums[2] += mac.carbs_g
+            sums[3] += mac.fat_g
+    targets = [profile.daily_calorie_target, profile.protein_target_g, profile.carb_target_g, profile.fat_target_g]
+    totals = sums
+    deltas = [s - t for s, t in zip(sums, targets)]
+    pcts = [0.0 if t == 0 else abs(a - t) / t for a, t in zip(totals, targets)]
+    score = max(0.0, 100.0 - sum(pcts) * 25.0)
+    flags = [name for name, pct in zip(_FLAG_NAMES, pcts) if pct > 0.2]
+    return totals, deltas, score, flags, pcts
+
+
+def _close(a: float, b: float) -> bool:
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return a == b or abs(a - b) <= TOL
+
+
+def _report_values(r) -> List[float]:
+    return [
+        r.total_calories, r.total_protein_g, r.total_carbs_g, r.total_fat_g,
+        r.calorie_delta, r.protein_delta, r.carb_delta, r.fat_delta,
+        r.score,
+    ]
+
+
+def _assert_day(got, ref, where):
+    totals, deltas, score, flags = got
+    ref_totals, ref_deltas, ref_score, ref_flags, ref_pcts = ref
+    for a, b in zip([*totals, *deltas, score], [*ref_totals, *ref_deltas, ref_score]):
+        assert _close(a, b), (where, got, ref)
+    for name, pct in zip(_FLAG_NAMES, ref_pcts):
+        if abs(pct - 0.2) > FLAG_TIE:
+            assert (name in flags) == (name in ref_flags), (where, got, ref)
+
+
+def test_targets_shared_per_target_set():
+    agent = HealthAgent()
+    assert agent._targets(UserHealthProfile()) is agent._targets(UserHealthProfile(diet_type="vegan"))
+    targets, inv_targets = agent._targets(_profiles()[1])
+    assert targets.tolist() == [1800, 120, 0, 60]
+    assert inv_targets.tolist() == [1 / 1800, 1 / 120, 0.0, 1 / 60]
+
+
+def test_backends_match_reference():
+    agent = HealthAgent()
+    for name, score_week in _backends().items():
+        for profile in _profiles():
+            for week in _random_weeks():
+                totals, deltas, scores, flag_bits = score_week(*_kernel_args(agent, week, profile))
+                for d, day in enumerate(week.days):
+                    flags = _FLAG_TABLE[int(flag_bits[d])]
+                    got = (totals[d].tolist(), deltas[d].tolist(), float(scores[d]), flags)
+                    _assert_day(got, _reference_day(day, profile), (name, day.day_name))
+
+
+def test_batch_backends_match_score_week():
+    agent = HealthAgent()
+    weeks = _random_weeks(seed=7)[:50]
+    for profile in _profiles():
+        args = [_kernel_args(agent, week, profile) for week in weeks]
+        arrs = [arr for arr, _, _ in args]
+        _, targets, inv_targets = args[0]
+        batch = np.zeros((len(arrs), max(a.shape[0] for a in arrs), max(a.shape[1] for a in arrs), 4))
+        for i, arr in enumerate(arrs):
+            batch[i, : arr.shape[0], : arr.shape[1]] = arr
+
+        for name, score_weeks in _batch_backends().items():
+            results = score_weeks(batch, targets, inv_targets)
+            for i, arr in enumerate(arrs):
+                n_days = arr.shape[0]
+                for got, want in zip(results, kernels.score_week(arr, targets, inv_targets)):
+                    assert np.allclose(got[i][:n_days], want, rtol=0, atol=TOL, equal_nan=True), (name, i)
+
+
+def test_nan_total_scores_zero():
+    # the original max(0.0, nan) gives 0.0 and NaN is never "far from target"
+    agent = HealthAgent()
+    profile = UserHealthProfile()
+    macros = MealNutrition(calories=float("nan"), protein_g=100, carbs_g=230, fat_g=70)
+    day = DayPlan(day_name="Day 1", meals=[Meal(id="nan", name="meal", ingredients=[], macros_per_serving=macros)])
+    week = WeekPlan(days=[day])
+    for name, score_week in _backends().items():
+        totals, deltas, scores, flag_bits = score_week(*_kernel_args(agent, week, profile))
+        assert scores.tolist() == [0.0] and flag_bits.tolist() == [0], name
+    report = agent.evaluate_week(week, profile).daily_reports[0]
+    assert report.score == 0.0 and report.flags == []
+
+
+def test_zero_target_ignores_non_finite_total():
+    # the original pct_delta returned 0 for a zero target whatever the total
+    agent = HealthAgent()
+    days = []
+    for carbs in ([float("nan")], [1e308, 1e308]):
+        meals = [
+            Meal(id=str(m), name="meal", ingredients=[], macros_per_serving=MealNutrition(
+                calories=600, protein_g=40, carbs_g=c, fat_g=20,
+            ))
+            for m, c in enumerate(carbs)
+        ]
+        days.append(DayPlan(day_name=f"Day {len(days) + 1}", meals=meals))
+    week = WeekPlan(days=days)
+
+    for profile in _profiles()[1:]:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            for name, score_week in _backends().items():
+                totals, deltas, scores, flag_bits = score_week(*_kernel_args(agent, week, profile))
+                for d, day in enumerate(week.days):
+                    got = (totals[d].tolist(), deltas[d].tolist(), float(scores[d]), _FLAG_TABLE[int(flag_bits[d])])
+                    _assert_day(got, _reference_day(day, profile), (name, day.day_name))
+
+
+def test_evaluate_week_matches_reference():
+    agent = HealthAgent()
+    for profile in _profiles():
+        for week in _random_weeks():
+            report = agent.evaluate_week(week, profile)
+            refs = [_reference_day(day, profile) for day in week.days]
+            assert len(report.daily_reports) == len(refs)
+            for r, ref in zip(report.daily_reports, refs):
+                values = _report_values(r)
+                _assert_day((values[:4], values[4:8], values[8], r.flags), ref, r.day_name)
+
+            ref_average = sum(ref[2] for ref in refs) / len(refs)
+            assert _close(report.average_score, ref_average)
+            assert report.global_flags == (["overall_plan_needs_adjustment"] if ref_average < 70 else [])
+
+            dumped = report.model_dump()
+            assert dumped["average_score"] == round(report.average_score, 1)
+            for r, day in zip(report.daily_reports, dumped["daily_reports"]):
+                assert day["score"] == round(r.score, 1) and day["total_calories"] == round(r.total_calories, 1)
+
+
+def test_evaluate_weeks_matches_evaluate_week():
+    agent = HealthAgent()
+    weeks = _random_weeks(seed=11)[:50]
+    for profile in _profiles():
+        for week, batched in zip(weeks, agent.evaluate_weeks(weeks, profile)):
+            single = agent.evaluate_week(week, profile)
+            assert len(batched.daily_reports) == len(single.daily_reports)
+            for a, b in zip(batched.daily_reports, single.daily_reports):
+                assert a.day_name == b.day_name and a.flags == b.flags, (a, b)
+                assert all(_close(x, y) for x, y in zip(_report_values(a), _report_values(b))), (a, b)
+            assert _close(batched.average_score, single.average_score)
+            assert batched.global_flags == single.global_flags
+    assert agent.evaluate_weeks([], UserHealthProfile()) == []
+
+
+if __name__ == "__main__":
+    print("Backends:", ", ".join(_backends()))
+    test_targets_shared_per_target_set()
+    print("✓ target arrays are shared per target set")
+    test_backends_match_reference()
+    print("✓ score_week backends match the reference scoring")
+    test_nan_total_scores_zero()
+    print("✓ a NaN total scores 0 on every backend")
+    test_zero_target_ignores_non_finite_total()
+    print("✓ a zero target ignores a NaN or inf total on every backend")
+    test_evaluate_week_matches_reference()
+    print("✓ evaluate_week matches the reference scoring")
+    test_batch_backends_match_score_week()
+    print("✓ score_weeks backends match score_week")
+    test_evaluate_weeks_matches_evaluate_week()
+    print("✓ evaluate_weeks matches evaluate_week")
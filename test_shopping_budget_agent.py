@@ -0,0 +1,74 @@
+"""
+Check ShoppingBudgetAgent.process budget handling
+
+Uses the demo GooglePriceFetcher, which prices every ingredient at 50.0,
+so totals are known in advance. Covers the early_exit_ratio cutoff: the
+"partial" flag, its absence when no ratio is given, and rejected ratios.
+
+Run directly (python test_shopping_budget_agent.py) or with pytest.
+"""
+
+import math
+
+from agents.shopping_budget_agent import ShoppingBudgetAgent
+
+RECIPE = {
+    "recipe_name": "Test Curry",
+    "ingredients": {
+        "Main": ["200 g paneer", "1 cup peas", "2 tomatoes"],
+        "Spices": ["1 tsp cumin", "1 tbsp oil", "3 cloves garlic"],
+    },
+}
+PRICE = 50.0
+
+
+def test_no_ratio_prices_everything():
+    result = ShoppingBudgetAgent().process(RECIPE, budget=100)
+    assert "partial" not in result
+    assert len(result["items"]) == 6
+    assert result["estimated_total_cost"] == 6 * PRICE
+    assert result["within_budget"] is False and result["amount_over_budget"] == 6 * PRICE - 100
+
+    result = ShoppingBudgetAgent().process(RECIPE)
+    assert "partial" not in result and result["within_budget"] is None
+
+
+def test_early_exit_stops_once_far_over_budget():
+    # stops at the first running total above 100 * 1.5
+    result = ShoppingBudgetAgent().process(RECIPE, budget=100, early_exit_ratio=1.5)
+    assert result["partial"] is True
+    assert len(result["items"]) == 4
+    assert result["estimated_total_cost"] == 4 * PRICE
+    assert result["within_budget"] is False and result["amount_over_budget"] == 4 * PRICE - 100
+
+
+def test_early_exit_not_reached():
+    result = ShoppingBudgetAgent().process(RECIPE, budget=1000, early_exit_ratio=1.5)
+    assert result["partial"] is False
+    assert len(result["items"]) == 6
+    assert result["within_budget"] is True and result["amount_under_budget"] == 1000 - 6 * PRICE
+
+
+def test_bad_early_exit_ratio_rejected():
+    agent = ShoppingBudgetAgent()
+    for kwargs in (
+        {"budget": 100, "early_exit_ratio": 0.5},
+        {"budget": 100, "early_exit_ratio": math.nan},
+        {"early_exit_ratio": 1.5},
+    ):
+        try:
+            agent.process(RECIPE, **kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"process accepted {kwargs}")
+
+
+if __name__ == "__main__":
+    test_no_ratio_prices_everything()
+    print("✓ no early_exit_ratio prices every line and adds no partial key")
+    test_early_exit_stops_once_far_over_budget()
+    print("✓ early exit stops once far over budget with partial=True")
+    test_early_exit_not_reached()
+    print("✓ partial=False when the cutoff is never reached")
+    test_bad_early_exit_ratio_rejected()
+    print("✓ ratios below 1, NaN and a ratio without budget raise ValueError")